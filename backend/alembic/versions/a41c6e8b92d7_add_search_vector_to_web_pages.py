@@ -0,0 +1,51 @@
+"""Add search_vector generated column to web_pages
+
+Revision ID: a41c6e8b92d7
+Revises: d7e2a9f0c318
+Create Date: 2026-10-15 11:03:27.841952
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "a41c6e8b92d7"
+down_revision: Union[str, Sequence[str], None] = "d7e2a9f0c318"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Stored so the /web-pages filter reads precomputed lexemes instead of
+    # running to_tsvector() on every row
+    op.add_column(
+        "web_pages",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "to_tsvector('english', coalesce(title, '') || ' ' || "
+                "coalesce(domain, '') || ' ' || coalesce(url, ''))",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "idx_web_pages_search_vector",
+        "web_pages",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_web_pages_search_vector", table_name="web_pages")
+    op.drop_column("web_pages", "search_vector")
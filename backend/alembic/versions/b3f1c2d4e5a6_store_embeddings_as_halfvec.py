@@ -0,0 +1,69 @@
+"""Store web_pages embeddings as halfvec
+
+Revision ID: b3f1c2d4e5a6
+Revises: 905a6fc28d5c
+Create Date: 2026-10-15 09:12:41.204518
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b3f1c2d4e5a6"
+down_revision: Union[str, Sequence[str], None] = "905a6fc28d5c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# halfvec and its operator classes first shipped in pgvector 0.7.0
+MIN_PGVECTOR_VERSION = (0, 7, 0)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    version = op.get_bind().execute(
+        sa.text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+    ).scalar()
+    installed = tuple(int(part) for part in (version or "0").split(".")[:3])
+    if installed < MIN_PGVECTOR_VERSION:
+        raise RuntimeError(
+            f"halfvec embeddings require pgvector >= 0.7.0, found {version or 'none'}; "
+            "upgrade the image (e.g. pgvector/pgvector:pg15) and run "
+            "ALTER EXTENSION vector UPDATE"
+        )
+
+    # The index opclass is tied to the column type, so rebuild it around the change
+    op.drop_index("idx_web_pages_embedding", table_name="web_pages")
+    op.execute(
+        "ALTER TABLE web_pages ALTER COLUMN embedding TYPE halfvec(1024) "
+        "USING embedding::halfvec(1024)"
+    )
+    # Search ranks by inner product (<#>), so index with the matching opclass
+    op.create_index(
+        "idx_web_pages_embedding",
+        "web_pages",
+        ["embedding"],
+        unique=False,
+        postgresql_using="ivfflat",
+        postgresql_with={"lists": 100},
+        postgresql_ops={"embedding": "halfvec_ip_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_web_pages_embedding", table_name="web_pages")
+    op.execute(
+        "ALTER TABLE web_pages ALTER COLUMN embedding TYPE vector(1024) "
+        "USING embedding::vector(1024)"
+    )
+    op.create_index(
+        "idx_web_pages_embedding",
+        "web_pages",
+        ["embedding"],
+        unique=False,
+        postgresql_using="ivfflat",
+        postgresql_with={"lists": 100},
+    )
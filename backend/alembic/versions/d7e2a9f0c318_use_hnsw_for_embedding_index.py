@@ -0,0 +1,58 @@
+"""Use HNSW for the web_pages embedding index
+
+Revision ID: d7e2a9f0c318
+Revises: b3f1c2d4e5a6
+Create Date: 2026-10-15 09:47:05.613290
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d7e2a9f0c318"
+down_revision: Union[str, Sequence[str], None] = "b3f1c2d4e5a6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "idx_web_pages_embedding",
+            table_name="web_pages",
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "idx_web_pages_embedding",
+            "web_pages",
+            ["embedding"],
+            unique=False,
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "halfvec_ip_ops"},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "idx_web_pages_embedding",
+            table_name="web_pages",
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "idx_web_pages_embedding",
+            "web_pages",
+            ["embedding"],
+            unique=False,
+            postgresql_using="ivfflat",
+            postgresql_with={"lists": 100},
+            postgresql_ops={"embedding": "halfvec_ip_ops"},
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,51 @@
+import logging
+from typing import Any, Callable, Optional
+
+import orjson
+import redis
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[redis.Redis] = None
+
+
+def get_redis() -> redis.Redis:
+    """Return the shared Redis client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5
+        )
+    return _client
+
+
+def get_cached(key: str) -> Optional[Any]:
+    """
+    Returns the cached JSON value for a key.
+    Misses and Redis errors both return None so callers fall back to the source.
+    """
+    try:
+        cached = get_redis().get(key)
+    except redis.RedisError as e:
+        logger.warning("Redis cache read failed for '%s': %s", key, e)
+        return None
+    return orjson.loads(cached) if cached is not None else None
+
+
+def set_cached(key: str, value: Any, ttl: int):
+    """Stores a JSON-serializable value under a key for ttl seconds."""
+    try:
+        get_redis().setex(key, ttl, orjson.dumps(value))
+    except redis.RedisError as e:
+        logger.warning("Redis cache write failed for '%s': %s", key, e)
+
+
+def cached_json(key: str, ttl: int, compute: Callable[[], Any]) -> Any:
+    """Returns the cached value for a key, computing and caching it on a miss."""
+    cached = get_cached(key)
+    if cached is not None:
+        return cached
+    value = compute()
+    set_cached(key, value, ttl)
+    return value
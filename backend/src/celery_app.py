@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.signals import worker_process_init
 from src.config import settings
 from src.instrumentation import instrument_celery
 
@@ -9,7 +10,13 @@ celery_app = Celery(
     backend=settings.celery_result_backend,
     include=["src.tasks"]  # Point to the module where tasks are defined
 )
-instrument_celery(celery_app)
+
+
+@worker_process_init.connect(weak=False)
+def init_worker_instrumentation(*args, **kwargs):
+    # Only worker processes export as celery-worker; the API imports this module too
+    instrument_celery(celery_app)
+
 
 # Celery configuration
 celery_app.conf.update(
@@ -19,7 +26,7 @@ celery_app.conf.update(
     accept_content=['json'],
     timezone='UTC',
     enable_utc=True,
-    worker_prefetch_multiplier=1,
+    worker_prefetch_multiplier=settings.celery_prefetch_multiplier,
     task_acks_late=True,
     # Define a dead-letter queue
     task_queues={
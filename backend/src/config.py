@@ -3,11 +3,21 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     ollama_url: str = "http://ollama:11434/api/embeddings"
+    ollama_embed_url: str = "http://ollama:11434/api/embed"
     ollama_chat_url: str = "http://ollama:11434/api/chat"
     ollama_llama_model: str = "llama3.2:latest"
+    # Single text/vision embeddings; llava image embeddings on CPU are slow
+    ollama_embed_timeout_seconds: float = 600.0
+    # Batched /api/embed calls carry many full pages; CPU Ollama can be slow
+    ollama_batch_timeout_seconds: float = 900.0
+    # Per-document content cap when building the RAG chat context
+    rag_max_doc_chars: int = 4000
     pg_host: str = "localhost"
     celery_broker_url: str = "redis://localhost:6379/0"
     celery_result_backend: str = "redis://localhost:6379/0"
+    redis_url: str = "redis://localhost:6379/1"
+    # Unacked tasks each worker process may hold locally; raise for short tasks
+    celery_prefetch_multiplier: int = 1
     rabbitmq_host: str = "localhost"
 
     class Config:
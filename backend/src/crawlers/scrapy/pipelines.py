@@ -1,20 +1,45 @@
 import logging
-from src.tasks import process_page_data_task
+from src.tasks import process_pages_batch_task
 
 logger = logging.getLogger(__name__)
 
 class CeleryPipeline:
     """
-    A Scrapy pipeline that sends each scraped item to a Celery task for processing.
+    A Scrapy pipeline that buffers scraped items and sends them to a Celery task in batches.
     """
+    def __init__(self, batch_size: int = 32):
+        self.batch_size = batch_size
+        self.buffer = []
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(batch_size=crawler.settings.getint("PAGE_BATCH_SIZE", 32))
+
     def process_item(self, item, spider):
         """
         This method is called for every item pipeline component.
         """
-        logger.info(f"Sending item to Celery task: {item.get('url')}")
+        logger.debug("Buffering item for Celery task: %s", item.get("url"))
+        # Convert the Scrapy item to a dictionary and queue it for the next batch
+        self.buffer.append(dict(item))
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+        return item
+
+    def close_spider(self, spider):
+        """
+        Sends any items still buffered when the crawl finishes.
+        """
+        self.flush()
+
+    def flush(self):
+        """
+        Sends the buffered items to the Celery batch task.
+        """
+        if not self.buffer:
+            return
+        batch, self.buffer = self.buffer, []
         try:
-            # Convert the Scrapy item to a dictionary and send it to the Celery task
-            process_page_data_task.delay(dict(item))
+            process_pages_batch_task.delay(batch)
         except Exception as e:
-            logger.error(f"Failed to send item to Celery task: {e}", exc_info=True)
-        return item
+            logger.error(f"Failed to send {len(batch)} items to Celery task: {e}", exc_info=True)
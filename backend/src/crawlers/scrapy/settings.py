@@ -16,3 +16,6 @@ USER_AGENT = 'Mozilla/5.0 (compatible; MyCrawler/1.0; +http://www.example.com)'
 ITEM_PIPELINES = {
    'src.crawlers.scrapy.pipelines.CeleryPipeline': 300,
 }
+
+# Number of scraped items sent to Celery per batch task
+PAGE_BATCH_SIZE = 32
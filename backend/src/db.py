@@ -1,12 +1,14 @@
 import json
 import os
+from contextlib import contextmanager
 from datetime import datetime
+from threading import BoundedSemaphore, Lock
 from typing import Any, Dict, List, Optional
 from urllib.parse import urlparse
 from uuid import UUID
 
-import psycopg2
-from psycopg2.extras import Json, RealDictCursor, register_uuid
+from psycopg2.extras import Json, RealDictCursor, execute_values, register_uuid
+from psycopg2.pool import ThreadedConnectionPool
 from src.models import JobCreate, JobUpdate
 
 # Register UUID adapter
@@ -21,69 +23,162 @@ DB_CONFIG = {
 }
 
 
-def get_db_connection():
-    """Create and return a new database connection."""
-    return psycopg2.connect(**DB_CONFIG)
+DB_POOL_MINCONN = int(os.getenv("DB_POOL_MINCONN", "2"))
+# Per process: every API worker and Celery child builds its own pool, so
+# processes x DB_POOL_MAXCONN must stay under Postgres max_connections (100 by
+# default). Callers beyond the cap wait in get_conn instead of failing.
+DB_POOL_MAXCONN = int(os.getenv("DB_POOL_MAXCONN", "8"))
+# HNSW candidate list size per vector search; higher trades speed for recall
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "64"))
+
+_pool: Optional[ThreadedConnectionPool] = None
+_pool_lock = Lock()
+# ThreadedConnectionPool raises PoolError when exhausted; this makes callers wait
+_pool_slots = BoundedSemaphore(DB_POOL_MAXCONN)
+
+
+def get_pool() -> ThreadedConnectionPool:
+    """Return the process-wide connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadedConnectionPool(
+                    DB_POOL_MINCONN, DB_POOL_MAXCONN, **DB_CONFIG
+                )
+    return _pool
+
+
+@contextmanager
+def get_conn():
+    """
+    Borrow a pooled connection for one transaction.
+    Commits on success, rolls back on error and always returns the connection.
+    Blocks until a connection is free rather than failing when the pool is full.
+    """
+    pool = get_pool()
+    _pool_slots.acquire()
+    try:
+        conn = pool.getconn()
+    except Exception:
+        _pool_slots.release()
+        raise
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        if not conn.closed:
+            conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn, close=bool(conn.closed))
+        _pool_slots.release()
+
+
+WEB_PAGE_UPSERT_SQL = """
+    INSERT INTO web_pages (
+        url, domain, title, meta_description, meta_tags,
+        content, embedding, file_type, embedding_type, last_crawled
+    ) VALUES %s
+    ON CONFLICT (url) DO UPDATE SET
+        title = EXCLUDED.title,
+        meta_description = EXCLUDED.meta_description,
+        meta_tags = EXCLUDED.meta_tags,
+        content = EXCLUDED.content,
+        embedding = EXCLUDED.embedding,
+        file_type = EXCLUDED.file_type,
+        embedding_type = EXCLUDED.embedding_type,
+        last_crawled = NOW()
+"""
+WEB_PAGE_UPSERT_TEMPLATE = (
+    "(%s, %s, %s, %s, %s, %s, CAST(%s AS halfvec), %s, %s, NOW())"
+)
+
+
+def _web_page_row(data: Dict[str, Any]) -> tuple:
+    """Build the upsert parameters for a single web page."""
+    meta_tags = json.dumps([])
+    try:
+        meta_tags = json.dumps(list(data.get("meta_tags", []) or []))
+    except Exception as e:
+        print(f"Error serializing meta_tags: {e}")
+        meta_tags = json.dumps([])
+
+    return (
+        data["url"],
+        urlparse(data["url"]).netloc,
+        data.get("title"),
+        data.get("meta_description"),
+        meta_tags,
+        data.get("content"),
+        data["embedding"],
+        data.get("file_type", "html"),
+        data.get("embedding_type", "text"),
+    )
 
 
 def insert_web_page(data: Dict[str, Any]):
     """Insert or update a web page in the database."""
     if not data:
         return
-    with get_db_connection() as conn:
-        with conn.cursor() as cur:
-            meta_tags = json.dumps([])
-            try:
-                meta_tags = json.dumps(list(data.get("meta_tags", []) or []))
-            except Exception as e:
-                print(f"Error serializing meta_tags: {e}")
-                meta_tags = json.dumps([])
+    insert_web_pages([data])
 
-            cur.execute(
-                """
-                INSERT INTO web_pages (
-                    url, domain, title, meta_description, meta_tags,
-                    content, embedding, file_type, embedding_type, last_crawled
-                ) VALUES (%s, %s, %s, %s, %s, %s, CAST(%s AS vector), %s, %s, NOW())
-                ON CONFLICT (url) DO UPDATE SET
-                    title = EXCLUDED.title,
-                    meta_description = EXCLUDED.meta_description,
-                    meta_tags = EXCLUDED.meta_tags,
-                    content = EXCLUDED.content,
-                    embedding = EXCLUDED.embedding,
-                    file_type = EXCLUDED.file_type,
-                    embedding_type = EXCLUDED.embedding_type,
-                    last_crawled = NOW()
-            """,
-                (
-                    data["url"],
-                    urlparse(data["url"]).netloc,
-                    data.get("title"),
-                    data.get("meta_description"),
-                    meta_tags,
-                    data.get("content"),
-                    data["embedding"],
-                    data.get("file_type", "html"),
-                    data.get("embedding_type", "text"),
-                ),
+
+def insert_web_pages(pages: List[Dict[str, Any]]):
+    """Insert or update several web pages with a single statement."""
+    # ON CONFLICT cannot update the same row twice in one statement, so keep
+    # only the last copy of each URL
+    rows = {page["url"]: _web_page_row(page) for page in pages if page}
+    if not rows:
+        return
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            execute_values(
+                cur,
+                WEB_PAGE_UPSERT_SQL,
+                list(rows.values()),
+                template=WEB_PAGE_UPSERT_TEMPLATE,
             )
 
 
+# Empty selectors keep snippets plain text; ts_headline would otherwise wrap
+# matches in unescaped <b> tags around crawled content
+SEARCH_SNIPPET_OPTIONS = 'MaxWords=30,MinWords=15,ShortWord=3,StartSel="",StopSel=""'
+
+
 def search_web_pages(
-    embedding: List[float], max_distance: float, top_k: int
+    embedding: List[float],
+    max_distance: float,
+    top_k: int,
+    snippet_query: Optional[str] = None,
 ) -> List[Dict[str, Any]]:
-    """Search for web pages by embedding similarity."""
-    with get_db_connection() as conn:
+    """
+    Search for web pages by embedding similarity.
+    With snippet_query, rows carry a ts_headline snippet instead of the full content.
+    """
+    if snippet_query is None:
+        text_column, params = "content", []
+    else:
+        text_column = (
+            "ts_headline('english', content, plainto_tsquery('english', %s), %s)"
+            " AS snippet"
+        )
+        params = [snippet_query, SEARCH_SNIPPET_OPTIONS]
+
+    with get_conn() as conn:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            # SET LOCAL is scoped to this transaction, so pooled connections keep
+            # the default; sending it with the SELECT saves a round trip
             cur.execute(
-                """
-                SELECT url, content, title, structured_data, (embedding <#> CAST(%s AS vector)) AS distance
+                f"""
+                SET LOCAL hnsw.ef_search = %s;
+                SELECT url, {text_column}, title, structured_data, (embedding <#> CAST(%s AS halfvec)) AS distance
                 FROM web_pages
-                WHERE (embedding <#> CAST(%s AS vector)) <= %s
+                WHERE (embedding <#> CAST(%s AS halfvec)) <= %s
                 ORDER BY distance
                 LIMIT %s
             """,
-                (embedding, embedding, max_distance, top_k),
+                [HNSW_EF_SEARCH, *params, embedding, embedding, max_distance, top_k],
             )
             return cur.fetchall()
 
@@ -93,7 +188,7 @@ def search_web_pages(
 
 def create_job(job_in: JobCreate) -> Dict[str, Any]:
     """Create a new job in the database."""
-    with get_db_connection() as conn:
+    with get_conn() as conn:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute(
                 """
@@ -108,7 +203,7 @@ def create_job(job_in: JobCreate) -> Dict[str, Any]:
 
 def get_job(job_id: UUID) -> Optional[Dict[str, Any]]:
     """Get a single job by its ID."""
-    with get_db_connection() as conn:
+    with get_conn() as conn:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute("SELECT * FROM jobs WHERE id = %s", (job_id,))
             return cur.fetchone()
@@ -116,7 +211,7 @@ def get_job(job_id: UUID) -> Optional[Dict[str, Any]]:
 
 def get_jobs(limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
     """Get a list of jobs with pagination."""
-    with get_db_connection() as conn:
+    with get_conn() as conn:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute(
                 "SELECT * FROM jobs ORDER BY created_at DESC LIMIT %s OFFSET %s",
@@ -127,7 +222,7 @@ def get_jobs(limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
 
 def update_job(job_id: UUID, job_up: JobUpdate) -> Optional[Dict[str, Any]]:
     """Update a job's status or result."""
-    with get_db_connection() as conn:
+    with get_conn() as conn:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             update_fields = []
             params = []
@@ -157,7 +252,7 @@ def update_job(job_id: UUID, job_up: JobUpdate) -> Optional[Dict[str, Any]]:
 
 def delete_job(job_id: UUID) -> bool:
     """Delete a job from the database."""
-    with get_db_connection() as conn:
+    with get_conn() as conn:
         with conn.cursor() as cur:
             cur.execute("DELETE FROM jobs WHERE id = %s", (job_id,))
             return cur.rowcount > 0
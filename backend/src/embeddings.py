@@ -1,20 +1,43 @@
 import base64
+import logging
+import math
 from io import BytesIO
 
 import numpy as np
 import requests
-from numpy import dot, linalg, random
+from numpy import linalg, random
 from PIL import Image
 from sklearn.decomposition import TruncatedSVD
 from src.config import settings
+from src.http_client import ollama_client
+
+logger = logging.getLogger(__name__)
 
 
 def create_embedding_with_ollama(text, model=settings.ollama_llama_model):
-    response = requests.post(settings.ollama_url, json={"model": model, "prompt": text})
+    response = ollama_client.post(
+        settings.ollama_url,
+        json={"model": model, "prompt": text},
+        timeout=settings.ollama_embed_timeout_seconds,
+    )
     response.raise_for_status()
     return response.json()["embedding"]
 
 
+def create_embeddings_batch_with_ollama(texts, model=settings.ollama_llama_model):
+    """
+    Generates embeddings for several texts in a single Ollama request.
+    Returns one embedding per input text, in the same order.
+    """
+    response = ollama_client.post(
+        settings.ollama_embed_url,
+        json={"model": model, "input": texts},
+        timeout=settings.ollama_batch_timeout_seconds,
+    )
+    response.raise_for_status()
+    return response.json()["embeddings"]
+
+
 def create_multimodal_embedding_with_ollama(image_url: str, model="llava:latest"):
     """
     Generates a multimodal embedding for an image using Ollama.
@@ -31,13 +54,14 @@ def create_multimodal_embedding_with_ollama(image_url: str, model="llava:latest"
     img_base64 = base64.b64encode(buffered.getvalue()).decode("utf-8")
 
     # Generate embedding
-    response = requests.post(
+    response = ollama_client.post(
         settings.ollama_url,
         json={
             "model": model,
             "prompt": "Describe this image.",  # A generic prompt is often needed
             "images": [img_base64],
         },
+        timeout=settings.ollama_embed_timeout_seconds,
     )
     response.raise_for_status()
     return response.json()["embedding"]
@@ -62,10 +86,25 @@ def reduce_vector(vector, dims=1024):
     return reduced.tolist()
 
 
+def normalize_and_fit(embedding: list[float], dims: int = 1024) -> list[float]:
+    """
+    L2-normalizes an embedding over all of its dimensions, then truncates or
+    zero-pads it to dims. Equivalent to truncate_or_pad_vector(normalize(v)),
+    done in a single float32 buffer without intermediate Python lists.
+    """
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = math.sqrt(float(vector @ vector))
+    fitted = np.zeros(dims, dtype=np.float32)
+    size = min(len(vector), dims)
+    fitted[:size] = vector[:size]
+    if norm:
+        fitted *= 1.0 / norm
+    return fitted.tolist()
+
+
 def normalize(embedding: list[float]) -> list[float]:
     norm = np.linalg.norm(embedding)
-    print(norm)
+    logger.debug("Embedding norm: %s", norm)
     if norm == 0:
         return embedding  # avoid division by zero
-    print(dot(norm, norm))
     return (np.array(embedding) / norm).tolist()
@@ -2,8 +2,7 @@ import logging
 from functools import lru_cache
 from typing import Dict
 
-from src.db import DB_CONFIG
-import psycopg2
+from src.db import get_conn
 from psycopg2.extras import RealDictCursor
 
 logger = logging.getLogger(__name__)
@@ -18,7 +17,7 @@ def get_all_flags() -> Dict[str, bool]:
     logger.info("Fetching feature flags from the database.")
     flags = {}
     try:
-        with psycopg2.connect(**DB_CONFIG) as conn:
+        with get_conn() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
                 cur.execute("SELECT name, is_enabled FROM feature_flags")
                 for row in cur.fetchall():
@@ -0,0 +1,13 @@
+import atexit
+
+import httpx
+
+# Shared client so Ollama requests reuse keep-alive connections instead of
+# opening a new TCP connection per call
+ollama_client = httpx.Client(
+    timeout=httpx.Timeout(120.0, connect=10.0),
+    limits=httpx.Limits(
+        max_keepalive_connections=40, max_connections=100, keepalive_expiry=30.0
+    ),
+)
+atexit.register(ollama_client.close)
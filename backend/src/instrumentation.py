@@ -3,6 +3,7 @@ import os
 
 from celery import Celery
 from fastapi import FastAPI
+from grpc import Compression
 from opentelemetry import trace
 from opentelemetry.exporter.otlp.proto.grpc._log_exporter import OTLPLogExporter
 from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
@@ -13,13 +14,22 @@ from opentelemetry.sdk._logs.export import BatchLogRecordProcessor
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
 from opentelemetry.semconv.resource import ResourceAttributes
 
+# Set once the FastAPI app has been instrumented in this process
+_INSTRUMENTED = False
+
 
 def setup_logging(service_name: str):
     """
     Sets up OpenTelemetry logging.
+    Does nothing if the root logger already exports through OpenTelemetry.
     """
+    root_logger = logging.getLogger()
+    if any(isinstance(h, LoggingHandler) for h in root_logger.handlers):
+        return
+
     resource = Resource.create(
         attributes={ResourceAttributes.SERVICE_NAME: service_name}
     )
@@ -29,7 +39,8 @@ def setup_logging(service_name: str):
 
     # Create an OTLPLogExporter
     log_exporter = OTLPLogExporter(
-        endpoint="http://crawler_otel_collector:4317/v1/logs"
+        endpoint="http://crawler_otel_collector:4317/v1/logs",
+        compression=Compression.Gzip,
     )
 
     # Create a BatchLogProcessor and add the exporter
@@ -38,20 +49,30 @@ def setup_logging(service_name: str):
 
     # Create a LoggingHandler and set the LoggerProvider
     handler = LoggingHandler(level=logging.INFO, logger_provider=logger_provider)
-    logging.getLogger().addHandler(handler)
+    root_logger.addHandler(handler)
 
 
 def instrument_application(app: FastAPI):
     """
     Instruments the FastAPI application with OpenTelemetry.
+    Only the first call in a process has an effect.
     """
+    global _INSTRUMENTED
+    if _INSTRUMENTED:
+        return
+    _INSTRUMENTED = True
+
     # Basic logging configuration for console output
     logging.basicConfig(level=logging.INFO)
     
     setup_logging("fastapi-app")
     resource = Resource.create(attributes={"service.name": "fastapi-app"})
 
-    trace.set_tracer_provider(TracerProvider(resource=resource))
+    # Sample a fraction of root traces; child spans follow their parent's decision
+    ratio = float(os.getenv("OTEL_TRACES_SAMPLER_ARG", "0.05"))
+    sampler = ParentBased(TraceIdRatioBased(ratio))
+
+    trace.set_tracer_provider(TracerProvider(resource=resource, sampler=sampler))
 
     otlp_endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")
     if not otlp_endpoint:
@@ -60,7 +81,9 @@ def instrument_application(app: FastAPI):
         logging.warning("OTEL_EXPORTER_OTLP_ENDPOINT not set. OTLP exporter is disabled.")
         return
 
-    otlp_exporter = OTLPSpanExporter(endpoint=otlp_endpoint, insecure=True)
+    otlp_exporter = OTLPSpanExporter(
+        endpoint=otlp_endpoint, insecure=True, compression=Compression.Gzip
+    )
 
     trace.get_tracer_provider().add_span_processor(BatchSpanProcessor(otlp_exporter))
 
@@ -1,15 +1,19 @@
+import asyncio
 import logging
 import os
+import time
 import uuid
 from contextlib import asynccontextmanager
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
-from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Query, Request
 from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
+from src.cache import cached_json
 from src.db import create_job, delete_job, get_job, get_jobs, update_job
 from src.feature_flags import clear_flag_cache, get_all_flags, is_feature_enabled
+from src.instrumentation import instrument_application
 from src.models import JobCreate, JobUpdate
 from src.search import get_dashboard_analytics, get_web_pages, rag_chat_stream, search
 from src.tasks import run_crawler_task
@@ -17,6 +21,14 @@ from starlette.middleware.cors import CORSMiddleware
 
 logger = logging.getLogger(__name__)
 
+# Identical unhandled exceptions log a full traceback at most once per window
+EXCEPTION_LOG_WINDOW_SECONDS = float(os.getenv("EXCEPTION_LOG_WINDOW_SECONDS", "60"))
+_EXCEPTION_LOG_MAX_KEYS = 1024
+_exception_last_logged: Dict[int, float] = {}
+
+# Polled dashboard endpoints are served from Redis for this many seconds
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3"))
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -44,6 +56,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+instrument_application(app)
+
 
 # Custom Exception Handler
 @app.exception_handler(ValueError)
@@ -56,7 +70,16 @@ async def value_error_exception_handler(request: Request, exc: ValueError):
 
 @app.exception_handler(Exception)
 async def generic_exception_handler(request: Request, exc: Exception):
-    logger.error(f"Unhandled exception: {exc}", exc_info=True)
+    key = hash((type(exc), str(exc)))
+    now = time.monotonic()
+    last_logged = _exception_last_logged.get(key)
+    if last_logged is None or now - last_logged >= EXCEPTION_LOG_WINDOW_SECONDS:
+        if len(_exception_last_logged) >= _EXCEPTION_LOG_MAX_KEYS:
+            _exception_last_logged.clear()
+        _exception_last_logged[key] = now
+        logger.error(f"Unhandled exception: {exc}", exc_info=True)
+    else:
+        logger.error("Unhandled exception (repeat): %s", type(exc).__name__)
     return JSONResponse(
         status_code=500,
         content={"error": "Internal Server Error", "detail": str(exc)},
@@ -67,15 +90,15 @@ async def generic_exception_handler(request: Request, exc: Exception):
 
 
 @app.get("/api/flags")
-def get_feature_flags():
+async def get_feature_flags() -> Dict[str, bool]:
     """
     Returns a dictionary of all feature flags and their current status.
     """
-    return get_all_flags()
+    return await asyncio.to_thread(get_all_flags)
 
 
 @app.post("/api/flags/clear-cache")
-def clear_feature_flag_cache():
+def clear_feature_flag_cache() -> Dict[str, str]:
     """
     Clears the in-memory cache for feature flags.
     """
@@ -84,51 +107,58 @@ def clear_feature_flag_cache():
 
 
 @app.get("/dashboard-analytics")
-def dashboard_analytics():
+async def dashboard_analytics() -> Dict[str, Any]:
     """Get dashboard analytics"""
-    return get_dashboard_analytics()
+    return await asyncio.to_thread(
+        cached_json,
+        "dash:analytics",
+        RESPONSE_CACHE_TTL_SECONDS,
+        get_dashboard_analytics,
+    )
 
 
 @app.get("/web-pages")
-def list_web_pages(
+async def list_web_pages(
     limit: int = 10,
     offset: int = 0,
-    sort_by: str = "created_at",
+    sort_by: str = "last_crawled",
     sort_order: str = "desc",
     query: Optional[str] = None,
-):
+) -> Dict[str, Any]:
     """List web pages with pagination, sorting, and filtering"""
-    return get_web_pages(limit, offset, sort_by, sort_order, query)
+    return await asyncio.to_thread(
+        get_web_pages, limit, offset, sort_by, sort_order, query
+    )
 
 
 @app.get("/api/jobs")
-def list_jobs_api(limit: int = 100, offset: int = 0):
+async def list_jobs_api(limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
     """List all crawler jobs"""
-    return get_jobs(limit=limit, offset=offset)
+    return await asyncio.to_thread(get_jobs, limit=limit, offset=offset)
 
 
 @app.get("/api/jobs/{job_id}")
-def get_job_api(job_id: uuid.UUID):
+async def get_job_api(job_id: uuid.UUID) -> Dict[str, Any]:
     """Get a specific job by ID"""
-    job = get_job(job_id)
+    job = await asyncio.to_thread(get_job, job_id)
     if job:
         return job
     raise HTTPException(status_code=404, detail="Job not found")
 
 
 @app.put("/api/jobs/{job_id}")
-def update_job_api(job_id: uuid.UUID, job_update: JobUpdate):
+async def update_job_api(job_id: uuid.UUID, job_update: JobUpdate) -> Dict[str, Any]:
     """Update a job's status or result"""
-    job = update_job(job_id, job_update)
+    job = await asyncio.to_thread(update_job, job_id, job_update)
     if job:
         return job
     raise HTTPException(status_code=404, detail="Job not found")
 
 
 @app.delete("/api/jobs/{job_id}")
-def delete_job_api(job_id: uuid.UUID):
+async def delete_job_api(job_id: uuid.UUID) -> Dict[str, str]:
     """Delete a job"""
-    if delete_job(job_id):
+    if await asyncio.to_thread(delete_job, job_id):
         return {"message": "Job deleted successfully"}
     raise HTTPException(status_code=404, detail="Job not found")
 
@@ -139,9 +169,33 @@ class StartCrawlerRequest(BaseModel):
     flags: Dict[str, Any] = {}
 
 
+def dispatch_crawler_task(job_id: str, req: StartCrawlerRequest):
+    """
+    Send the crawl to Celery and mark the job as queued. The client already
+    has its 202, so a dispatch failure is recorded on the job instead.
+    """
+    try:
+        run_crawler_task.delay(job_id, req.domain, req.depth, req.flags)
+
+        logger.info(f"Dispatched crawler task for job: {job_id}")
+        update_job(uuid.UUID(job_id), JobUpdate(status="queued"))
+    except Exception as e:
+        logger.error(
+            f"Failed to dispatch crawler task for job: {job_id}: {e}", exc_info=True
+        )
+        try:
+            update_job(
+                uuid.UUID(job_id), JobUpdate(status="failed", result={"error": str(e)})
+            )
+        except Exception:
+            logger.error(f"Failed to mark job {job_id} as failed", exc_info=True)
+
+
 @app.post("/start-crawler", status_code=202)
-def start_crawler(req: StartCrawlerRequest):
-    """Start a crawler by dispatching a Celery task."""
+async def start_crawler(
+    req: StartCrawlerRequest, background_tasks: BackgroundTasks
+) -> Dict[str, Any]:
+    """Start a crawler by dispatching a Celery task after responding."""
     job_in = JobCreate(
         parameters={
             "domain": req.domain,
@@ -149,13 +203,10 @@ def start_crawler(req: StartCrawlerRequest):
             "flags": req.flags,
         }
     )
-    job = create_job(job_in)
+    job = await asyncio.to_thread(create_job, job_in)
     job_id = str(job["id"])
 
-    run_crawler_task.delay(job_id, req.domain, req.depth, req.flags)
-
-    logger.info(f"Dispatched crawler task for job: {job_id}")
-    update_job(uuid.UUID(job_id), JobUpdate(status="queued"))
+    background_tasks.add_task(dispatch_crawler_task, job_id, req)
 
     return {
         "status": "queued",
@@ -167,34 +218,44 @@ def start_crawler(req: StartCrawlerRequest):
 
 
 @app.get("/crawler-status/{job_id}")
-def get_crawler_status(job_id: uuid.UUID):
+async def get_crawler_status(job_id: uuid.UUID) -> Dict[str, Any]:
     """Get the status of a specific crawler from the database."""
-    job_info = get_job(job_id)
+    job_info = await asyncio.to_thread(get_job, job_id)
     if not job_info:
         raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
     return job_info
 
 
-@app.get("/crawlers-status")
-def get_all_crawlers_status_api():
-    """Get the status of all crawlers from the database."""
+def build_crawlers_status() -> Dict[str, Any]:
+    """Collect the status of all crawlers from the database."""
     jobs = get_jobs(limit=1000)
     return {
         "total_jobs": len(jobs),
         "crawlers": jobs,
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
     }
 
 
+@app.get("/crawlers-status")
+async def get_all_crawlers_status_api() -> Dict[str, Any]:
+    """Get the status of all crawlers from the database."""
+    return await asyncio.to_thread(
+        cached_json,
+        "crawlers:status",
+        RESPONSE_CACHE_TTL_SECONDS,
+        build_crawlers_status,
+    )
+
+
 class SearchRequest(BaseModel):
     query: str
     limit: int = 5
 
 
 @app.post("/search")
-def search_api(req: SearchRequest):
+async def search_api(req: SearchRequest) -> List[Dict[str, Any]]:
     """Search endpoint"""
-    results = search(req.query, req.limit)
+    results = await asyncio.to_thread(search, req.query, req.limit)
     return results
 
 
@@ -241,11 +302,18 @@ if __name__ == "__main__":
 
     logging.info("FastAPI application starting...")
 
+    reload = os.getenv("DEV", "0") == "1"
+    # uvicorn does not allow workers together with reload
+    workers = None if reload else int(os.getenv("WEB_CONCURRENCY", os.cpu_count()))
+
     uvicorn.run(
         "src.main:app",
         host=os.getenv("FLASK_HOST", "0.0.0.0"),
         port=int(os.getenv("FLASK_PORT", "5000")),
-        reload=True,
+        reload=reload,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
     )
 
     logging.info("FastAPI application started successfully.")
@@ -1,6 +1,7 @@
 from sqlalchemy import (
     create_engine,
     Column,
+    Computed,
     Integer,
     String,
     Text,
@@ -8,10 +9,10 @@ from sqlalchemy import (
     JSON,
     Index,
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func, text
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import HALFVEC
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
 from datetime import datetime
@@ -29,15 +30,20 @@ class WebPage(Base):
     meta_description = Column(Text)
     meta_tags = Column(JSON)
     content = Column(Text)
-    embedding = Column(Vector(1024))
+    embedding = Column(HALFVEC(1024))
     file_type = Column(String, nullable=False, default='html')
     embedding_type = Column(String, nullable=False, default='text')
     last_crawled = Column(DateTime, server_default=func.now())
+    search_vector = Column(
+        TSVECTOR,
+        Computed("to_tsvector('english', coalesce(title, '') || ' ' || coalesce(domain, '') || ' ' || coalesce(url, ''))", persisted=True),
+    )
 
     __table_args__ = (
-        Index('idx_web_pages_embedding', 'embedding', postgresql_using='ivfflat', postgresql_with={'lists': 100}),
+        Index('idx_web_pages_embedding', 'embedding', postgresql_using='hnsw', postgresql_with={'m': 16, 'ef_construction': 64}, postgresql_ops={'embedding': 'halfvec_ip_ops'}),
         Index('idx_web_pages_url', 'url'),
-        Index('idx_web_pages_textsearch', 'title', 'meta_description', 'content', postgresql_using='gin'),
+        Index('idx_web_pages_textsearch', text("to_tsvector('english', coalesce(title, '') || ' ' || coalesce(meta_description, '') || ' ' || coalesce(content, ''))"), postgresql_using='gin'),
+        Index('idx_web_pages_search_vector', 'search_vector', postgresql_using='gin'),
     )
 
 class Job(Base):
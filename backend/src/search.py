@@ -1,47 +1,104 @@
-import json
+import asyncio
+import hashlib
 import logging
-import re
+from array import array
+from functools import lru_cache
+from typing import List
 
 import httpx
-import numpy as np
-import psycopg2
+import orjson
 from psycopg2.extras import RealDictCursor
+from src.cache import get_cached, set_cached
 from src.config import settings
-from src.db import DB_CONFIG, search_web_pages
-from src.embeddings import (
-    create_embedding_with_ollama,
-    normalize,
-    truncate_or_pad_vector,
-)
+from src.db import get_conn, search_web_pages
+from src.embeddings import create_embedding_with_ollama, normalize_and_fit
 
 logger = logging.getLogger(__name__)
 
+RAG_PROMPT_HEADER = """
+    You are an expert assistant. Answer the user's question based ONLY on the following context.
+    If the context does not contain the answer, say "I could not find an answer in the provided documents."
 
-def get_dashboard_analytics():
-    with psycopg2.connect(**DB_CONFIG) as conn:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute("SELECT COUNT(DISTINCT domain) as total_domains FROM web_pages")
-            total_domains = cur.fetchone()["total_domains"]
+    Context:
+    """
+RAG_PROMPT_FOOTER = """
 
-            cur.execute("SELECT COUNT(*) as total_urls FROM web_pages")
-            total_urls = cur.fetchone()["total_urls"]
+    """
+
+
+QUERY_EMBEDDING_CACHE_TTL_SECONDS = 3600
+
+
+@lru_cache(maxsize=256)
+def _embed_query(query: str) -> array:
+    # Redis shares embeddings across workers; the small LRU above skips even
+    # that hop for hot queries. float32 arrays keep each entry ~4 KB.
+    digest = hashlib.sha256(
+        f"{settings.ollama_llama_model}:{query}".encode("utf-8")
+    ).hexdigest()
+    key = f"embedding:query:{digest}"
+    cached = get_cached(key)
+    if cached is not None:
+        return array("f", cached)
+
+    embedding = normalize_and_fit(create_embedding_with_ollama(query), dims=1024)
+    set_cached(key, embedding, QUERY_EMBEDDING_CACHE_TTL_SECONDS)
+    return array("f", embedding)
+
+
+def get_query_embedding(query: str) -> List[float]:
+    """
+    Returns the normalized 1024-dim embedding for a search query.
+    Vectors are cached in process and in Redis by normalized query text to
+    skip repeat Ollama calls.
+    """
+    return list(_embed_query(query.strip().lower()))
 
-            cur.execute(
-                "SELECT COUNT(*) as running_crawlers FROM jobs WHERE status = 'running'"
-            )
-            running_crawlers = cur.fetchone()["running_crawlers"]
 
+def get_dashboard_analytics():
+    with get_conn() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute(
-                "SELECT COUNT(*) as jobs_completed FROM jobs WHERE status = 'completed'"
+                """
+                SELECT
+                    (SELECT COUNT(DISTINCT domain) FROM web_pages) AS total_domains,
+                    (SELECT COUNT(*) FROM web_pages) AS total_urls,
+                    COUNT(*) FILTER (WHERE status = 'running') AS running_crawlers,
+                    COUNT(*) FILTER (WHERE status = 'completed') AS jobs_completed
+                FROM jobs
+            """
             )
-            jobs_completed = cur.fetchone()["jobs_completed"]
+            return dict(cur.fetchone())
 
-            return {
-                "total_domains": total_domains,
-                "total_urls": total_urls,
-                "running_crawlers": running_crawlers,
-                "jobs_completed": jobs_completed,
-            }
+
+WEB_PAGE_LIST_COLUMNS = ("id", "url", "domain", "title", "last_crawled")
+WEB_PAGE_SORT_ORDERS = ("asc", "desc")
+
+# The window count returns the filtered total with the page in one scan
+_WEB_PAGES_SELECT = (
+    f"SELECT {', '.join(WEB_PAGE_LIST_COLUMNS)}, "
+    "COUNT(*) OVER() AS total FROM web_pages"
+)
+# search_vector is a stored, GIN-indexed tsvector of title/domain/url
+_WEB_PAGES_FILTER = " WHERE search_vector @@ plainto_tsquery('english', %s)"
+
+# Every allowed (sort_by, sort_order, filtered) combination maps to fixed SQL
+# text built once, so request values are never interpolated into a query
+WEB_PAGE_QUERIES = {
+    (sort_by, sort_order, filtered): (
+        _WEB_PAGES_SELECT
+        + (_WEB_PAGES_FILTER if filtered else "")
+        + f" ORDER BY {sort_by} {sort_order.upper()} LIMIT %s OFFSET %s"
+    )
+    for sort_by in WEB_PAGE_LIST_COLUMNS
+    for sort_order in WEB_PAGE_SORT_ORDERS
+    for filtered in (False, True)
+}
+# Used only when the window count has no row to ride on (offset past the end)
+WEB_PAGE_COUNT_QUERIES = {
+    False: "SELECT COUNT(*) FROM web_pages",
+    True: "SELECT COUNT(*) FROM web_pages" + _WEB_PAGES_FILTER,
+}
 
 
 def get_web_pages(
@@ -51,47 +108,45 @@ def get_web_pages(
     sort_order: str = "desc",
     query: str = None,
 ):
-    with psycopg2.connect(**DB_CONFIG) as conn:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            sql_query = "SELECT id, url, domain, title, last_crawled FROM web_pages"
-            count_query = "SELECT COUNT(*) FROM web_pages"
-            params = []
-
-            if query:
-                sql_query += " WHERE to_tsvector('english', title || ' ' || domain || ' ' || url) @@ to_tsquery('english', %s)"
-                count_query += " WHERE to_tsvector('english', title || ' ' || domain || ' ' || url) @@ to_tsquery('english', %s)"
-                params.append(query)
+    sql_query = WEB_PAGE_QUERIES.get((sort_by, sort_order.lower(), bool(query)))
+    if sql_query is None:
+        raise ValueError(f"Unsupported sort '{sort_by} {sort_order}'")
 
-            cur.execute(count_query, params)
-            total = cur.fetchone()["count"]
-
-            sql_query += f" ORDER BY {sort_by} {sort_order} LIMIT %s OFFSET %s"
-            params.extend([limit, offset])
+    params = [query, limit, offset] if query else [limit, offset]
 
+    with get_conn() as conn:
+        with conn.cursor() as cur:
             cur.execute(sql_query, params)
-            web_pages = cur.fetchall()
+            rows = cur.fetchall()
+
+            # Plain tuples avoid building a dict per row only to drop the total
+            if rows:
+                total = rows[0][-1]
+            elif offset > 0:
+                cur.execute(WEB_PAGE_COUNT_QUERIES[bool(query)], params[:-2])
+                total = cur.fetchone()[0]
+            else:
+                total = 0
+            web_pages = [dict(zip(WEB_PAGE_LIST_COLUMNS, row)) for row in rows]
 
             return {"total": total, "data": web_pages}
 
 
 def search(query, top_k):
-    print("Searching for:", query)
-    embedding = create_embedding_with_ollama(query)
-    print(f"Embedding shape: {np.array(embedding).shape}")
-    embedding = normalize(embedding)
-    embedding = truncate_or_pad_vector(embedding, dims=1024)
-    print(f"Reduced embedding shape: {np.array(embedding).shape}")
+    logger.info("Searching for: %s", query)
+    embedding = get_query_embedding(query)
+    logger.debug("Query embedding dims: %d", len(embedding))
     threshold = 0.95
     max_distance = 1 - threshold
-    results = search_web_pages(embedding, max_distance, top_k)
+    # Snippets come from ts_headline so full page content never leaves the DB
+    results = search_web_pages(embedding, max_distance, top_k, snippet_query=query)
     output = []
     for row in results:
-        snippet = extract_snippet(row["content"], query)
         output.append(
             {
                 "url": row["url"],
                 "title": row["title"],
-                "snippet": snippet,
+                "snippet": row["snippet"],
                 "distance": row["distance"],
                 "structured_data": row.get("structured_data"),
             }
@@ -99,43 +154,30 @@ def search(query, top_k):
     return output
 
 
-def extract_snippet(content: str, query: str, max_len: int = 200):
-    terms = re.findall(r"\w+", query.lower())
-    content_lower = content.lower()
-    for term in terms:
-        idx = content_lower.find(term)
-        if idx != -1:
-            start = max(0, idx - max_len // 2)
-            end = min(len(content), idx + max_len // 2)
-            snippet = content[start:end].strip()
-            return "... " + snippet + " ..."
-    return content[:max_len].strip() + "..."
-
-
 async def rag_chat_stream(query: str, top_k: int = 5):
     """
     Performs a RAG search and streams the LLM response using the Vercel AI SDK data protocol.
     """
-    # 1. Get context from the database
-    embedding = create_embedding_with_ollama(query)
-    embedding = normalize(embedding)
-    embedding = truncate_or_pad_vector(embedding, dims=1024)
+    # 1. Get context from the database, off the event loop: both calls block
+    embedding = await asyncio.to_thread(get_query_embedding, query)
     threshold = 0.95
     max_distance = 1 - threshold
-    context_docs = search_web_pages(embedding, max_distance, top_k)
-
-    # 2. Format the prompt
-    context_str = "\n\n".join(
-        [f"URL: {doc['url']}\nContent: {doc['content']}" for doc in context_docs]
+    context_docs = await asyncio.to_thread(
+        search_web_pages, embedding, max_distance, top_k
     )
-    system_prompt = f"""
-    You are an expert assistant. Answer the user's question based ONLY on the following context.
-    If the context does not contain the answer, say "I could not find an answer in the provided documents."
-
-    Context:
-    {context_str}
 
-    """
+    # 2. Format the prompt in a single join, capping each document's content
+    max_chars = settings.rag_max_doc_chars
+    parts = [RAG_PROMPT_HEADER]
+    for i, doc in enumerate(context_docs):
+        if i:
+            parts.append("\n\n")
+        parts.append("URL: ")
+        parts.append(doc["url"])
+        parts.append("\nContent: ")
+        parts.append((doc["content"] or "")[:max_chars])
+    parts.append(RAG_PROMPT_FOOTER)
+    system_prompt = "".join(parts)
 
     messages = [
         {"role": "system", "content": system_prompt},
@@ -157,14 +199,16 @@ async def rag_chat_stream(query: str, top_k: int = 5):
             response.raise_for_status()
 
             async for line in response.aiter_lines():
-                if not line.strip():
+                if not line or line.isspace():
                     continue
                 try:
-                    json_chunk = json.loads(line)
-                    content = json_chunk.get("message", {}).get("content", "")
-                    if content:
-                        # Send as per Vercel AI streaming protocol
-                        # yield f"1:{json.dumps(content)}\n"
-                        yield f"{content}"
-                except json.JSONDecodeError:
+                    json_chunk = orjson.loads(line)
+                except orjson.JSONDecodeError:
                     continue
+                message = json_chunk.get("message") or {}
+                content = message.get("content")
+                if content:
+                    # Send as per Vercel AI streaming protocol
+                    # yield f"1:{json.dumps(content)}\n"
+                    # Yield bytes so StreamingResponse does not re-encode each chunk
+                    yield content.encode("utf-8")
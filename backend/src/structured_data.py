@@ -4,6 +4,7 @@ from typing import Any, Dict
 
 import httpx
 from src.config import settings
+from src.http_client import ollama_client
 
 logger = logging.getLogger(__name__)
 
@@ -70,7 +71,7 @@ def extract_structured_data_with_ollama(
     prompt = generate_extraction_prompt(content, schema)
 
     try:
-        response = httpx.post(
+        response = ollama_client.post(
             settings.ollama_chat_url,
             json={
                 "model": settings.ollama_llama_model,
@@ -3,12 +3,12 @@ from uuid import UUID
 
 from src.celery_app import celery_app
 from src.crawlers.crawler_factory import run_scrapy_crawl
-from src.db import insert_web_page, update_job
+from src.db import insert_web_page, insert_web_pages, update_job
 from src.embeddings import (
     create_embedding_with_ollama,
+    create_embeddings_batch_with_ollama,
     create_multimodal_embedding_with_ollama,
-    normalize,
-    truncate_or_pad_vector,
+    normalize_and_fit,
 )
 from src.feature_flags import is_feature_enabled
 from src.models import JobUpdate
@@ -48,6 +48,86 @@ def run_crawler_task(self, job_id: str, domain: str, depth: int, flags: dict):
         raise
 
 
+def _is_valid_page_data(page_data: dict) -> bool:
+    """
+    Checks that page data has what is needed to embed and store it.
+    """
+    if not page_data.get("url"):
+        logger.error("Received page data with missing URL.")
+        return False
+
+    file_type = page_data.get("file_type", "html")
+    if not page_data.get("content") and file_type not in ["image"]:
+        logger.error(
+            f"Received page data with missing content for file type {file_type}."
+        )
+        return False
+
+    return True
+
+
+def _create_page_embedding(page_data: dict):
+    """
+    Generates the raw embedding for a single page based on its embedding type.
+    """
+    embedding_type = page_data.get("embedding_type", "text")
+    if embedding_type == "text":
+        return create_embedding_with_ollama(page_data.get("content"))
+    if embedding_type == "vision":
+        return create_multimodal_embedding_with_ollama(page_data.get("url"))
+    return None
+
+
+def _build_db_page_data(page_data: dict, embedding) -> dict:
+    """
+    Normalizes the embedding and extracts structured data for a page.
+    """
+    url = page_data.get("url")
+    content = page_data.get("content")
+
+    if embedding:
+        embedding = normalize_and_fit(embedding, dims=1024)
+
+    # Conditionally extract structured data
+    structured_data = None
+    if is_feature_enabled("structured_data_extraction") and content:
+        structured_data = extract_structured_data_with_ollama(content)
+
+    db_page_data = {
+        "url": url,
+        "title": page_data.get("title"),
+        "meta_description": page_data.get("meta_description"),
+        "meta_tags": page_data.get("meta_tags"),
+        "content": content,
+        "embedding": embedding,
+        "file_type": page_data.get("file_type", "html"),
+        "embedding_type": page_data.get("embedding_type", "text"),
+        "structured_data": structured_data,
+    }
+    return db_page_data
+
+
+def _try_build_db_page_data(page_data: dict, embedding=None):
+    """
+    Builds DB page data for one page of a batch, embedding it individually
+    when no precomputed embedding is given. On failure the page is handed to
+    process_page_data_task, which keeps its own retries, and None is returned
+    so a single bad page does not force the whole batch to retry.
+    """
+    try:
+        if embedding is None:
+            embedding = _create_page_embedding(page_data)
+        return _build_db_page_data(page_data, embedding)
+    except Exception as e:
+        logger.warning(
+            "Re-dispatching page %s from batch on its own: %s",
+            page_data.get("url"),
+            e,
+        )
+        process_page_data_task.delay(page_data)
+        return None
+
+
 @celery_app.task(
     bind=True,
     autoretry_for=(Exception,),
@@ -58,55 +138,70 @@ def process_page_data_task(self, page_data: dict):
     """
     Celery task to process a single page's data: generate embeddings and save to DB.
     """
+    if not _is_valid_page_data(page_data):
+        return
+
     url = page_data.get("url")
-    content = page_data.get("content")
     file_type = page_data.get("file_type", "html")
-    embedding_type = page_data.get("embedding_type", "text")
-
-    if not url:
-        logger.error("Received page data with missing URL.")
-        return
+    logger.info("Processing %s for embedding and insertion: %s", file_type, url)
 
-    if not content and file_type not in ["image"]:
-        logger.error(
-            f"Received page data with missing content for file type {file_type}."
+    try:
+        insert_web_page(
+            _build_db_page_data(page_data, _create_page_embedding(page_data))
         )
-        return
+        logger.info("Successfully inserted page: %s", url)
+    except Exception as e:
+        logger.error(f"Failed to process and insert page {url}: {e}", exc_info=True)
+        raise
 
-    logger.info(f"Processing {file_type} for embedding and insertion: {url}")
 
-    try:
-        if embedding_type == "text":
-            embedding = create_embedding_with_ollama(content)
-        elif embedding_type == "vision":
-            embedding = create_multimodal_embedding_with_ollama(url)
-        else:
-            embedding = None
-
-        if embedding:
-            embedding = normalize(embedding)
-            embedding = truncate_or_pad_vector(embedding, dims=1024)
-
-        # Conditionally extract structured data
-        structured_data = None
-        if is_feature_enabled("structured_data_extraction") and content:
-            structured_data = extract_structured_data_with_ollama(content)
-
-        db_page_data = {
-            "url": url,
-            "title": page_data.get("title"),
-            "meta_description": page_data.get("meta_description"),
-            "meta_tags": page_data.get("meta_tags"),
-            "content": content,
-            "embedding": embedding,
-            "file_type": file_type,
-            "embedding_type": embedding_type,
-            "structured_data": structured_data,
-        }
-
-        insert_web_page(db_page_data)
-        logger.info(f"Successfully inserted page: {url}")
+@celery_app.task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_kwargs={"max_retries": 3, "countdown": 60},
+    acks_late=True,
+)
+def process_pages_batch_task(self, page_datas: list):
+    """
+    Celery task to process a batch of pages. Text pages are embedded with a
+    single Ollama request, other pages one at a time, and the whole batch is
+    upserted with a single statement. A page whose own embedding or
+    structured data step fails is retried as a single-page task so the rest
+    still land.
+    """
+    pages = [page_data for page_data in page_datas if _is_valid_page_data(page_data)]
+    text_pages = [p for p in pages if p.get("embedding_type", "text") == "text"]
+    other_pages = [p for p in pages if p.get("embedding_type", "text") != "text"]
 
+    logger.info(
+        "Processing batch of %d pages (%d text) for embedding and insertion",
+        len(pages),
+        len(text_pages),
+    )
+
+    try:
+        db_pages = []
+        if text_pages:
+            embeddings = create_embeddings_batch_with_ollama(
+                [page_data["content"] for page_data in text_pages]
+            )
+            if len(embeddings) != len(text_pages):
+                raise ValueError(
+                    f"Expected {len(text_pages)} embeddings, got {len(embeddings)}"
+                )
+            for page_data, embedding in zip(text_pages, embeddings):
+                db_page = _try_build_db_page_data(page_data, embedding)
+                if db_page:
+                    db_pages.append(db_page)
+
+        for page_data in other_pages:
+            db_page = _try_build_db_page_data(page_data)
+            if db_page:
+                db_pages.append(db_page)
+
+        if db_pages:
+            insert_web_pages(db_pages)
+        logger.info("Successfully inserted %d pages", len(db_pages))
     except Exception as e:
-        logger.error(f"Failed to process and insert page {url}: {e}", exc_info=True)
+        logger.error(f"Failed to process page batch: {e}", exc_info=True)
         raise
@@ -0,0 +1,25 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+@pytest.fixture
+def mock_db_cursor():
+    """
+    Patches get_conn in the given module and returns the cursor mock that
+    its connection hands out, so SQL and parameters can be inspected.
+    """
+    patchers = []
+
+    def _mock_db_cursor(get_conn_target):
+        cursor = MagicMock()
+        patcher = patch(get_conn_target)
+        mock_get_conn = patcher.start()
+        patchers.append(patcher)
+        conn = mock_get_conn.return_value.__enter__.return_value
+        conn.cursor.return_value.__enter__.return_value = cursor
+        return cursor
+
+    yield _mock_db_cursor
+    for patcher in patchers:
+        patcher.stop()
@@ -0,0 +1,44 @@
+from unittest.mock import MagicMock, patch
+
+import orjson
+import redis
+from src.cache import cached_json
+
+
+@patch('src.cache.get_redis')
+def test_cached_json_returns_cached_value(mock_get_redis):
+    """Test that a cache hit skips the compute function."""
+    mock_get_redis.return_value.get.return_value = orjson.dumps({"total_urls": 3})
+    compute = MagicMock()
+
+    result = cached_json("dash:analytics", 3, compute)
+
+    assert result == {"total_urls": 3}
+    compute.assert_not_called()
+
+
+@patch('src.cache.get_redis')
+def test_cached_json_computes_and_stores_on_miss(mock_get_redis):
+    """Test that a cache miss computes the value and stores it with the TTL."""
+    mock_client = mock_get_redis.return_value
+    mock_client.get.return_value = None
+    compute = MagicMock(return_value={"total_urls": 3})
+
+    result = cached_json("dash:analytics", 3, compute)
+
+    assert result == {"total_urls": 3}
+    compute.assert_called_once()
+    mock_client.setex.assert_called_once_with(
+        "dash:analytics", 3, orjson.dumps({"total_urls": 3})
+    )
+
+
+@patch('src.cache.get_redis')
+def test_cached_json_falls_back_when_redis_is_down(mock_get_redis):
+    """Test that Redis errors fall through to the compute function."""
+    mock_client = mock_get_redis.return_value
+    mock_client.get.side_effect = redis.ConnectionError("down")
+    mock_client.setex.side_effect = redis.ConnectionError("down")
+    compute = MagicMock(return_value={"total_urls": 3})
+
+    assert cached_json("dash:analytics", 3, compute) == {"total_urls": 3}
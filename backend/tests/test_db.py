@@ -0,0 +1,72 @@
+import threading
+from threading import BoundedSemaphore
+from unittest.mock import MagicMock, patch
+
+from src.db import get_conn, insert_web_pages, search_web_pages
+
+
+@patch('src.db._pool_slots', new_callable=lambda: BoundedSemaphore(1))
+@patch('src.db.get_pool')
+def test_get_conn_waits_for_a_free_connection(mock_get_pool, mock_pool_slots):
+    """Test that a caller queues for a connection instead of exhausting the pool."""
+    mock_get_pool.return_value.getconn.side_effect = lambda: MagicMock(closed=0)
+    borrowed = threading.Event()
+
+    def borrow():
+        with get_conn():
+            borrowed.set()
+
+    with get_conn():
+        waiter = threading.Thread(target=borrow)
+        waiter.start()
+        assert not borrowed.wait(0.2)
+
+    waiter.join(timeout=2)
+    assert borrowed.is_set()
+    assert mock_get_pool.return_value.putconn.call_count == 2
+
+
+@patch('src.db.execute_values')
+@patch('src.db.get_conn')
+def test_insert_web_pages_upserts_last_copy_of_each_url(mock_get_conn, mock_execute_values):
+    """Test that a batch is upserted in one statement with duplicate URLs collapsed."""
+    pages = [
+        {"url": "http://example.com/a", "title": "Old A", "embedding": [0.1]},
+        {"url": "http://example.com/b", "title": "B", "embedding": [0.2]},
+        {"url": "http://example.com/a", "title": "New A", "embedding": [0.3]},
+    ]
+
+    insert_web_pages(pages)
+
+    mock_execute_values.assert_called_once()
+    _, sql, rows = mock_execute_values.call_args.args
+    assert "ON CONFLICT (url)" in sql
+    assert [(row[0], row[2]) for row in rows] == [
+        ("http://example.com/a", "New A"),
+        ("http://example.com/b", "B"),
+    ]
+    assert rows[0][1] == "example.com"
+    assert "CAST(%s AS halfvec)" in mock_execute_values.call_args.kwargs["template"]
+
+
+@patch('src.db.get_conn')
+def test_insert_web_pages_skips_empty_batch(mock_get_conn):
+    """Test that an empty batch does not borrow a connection."""
+    insert_web_pages([])
+
+    mock_get_conn.assert_not_called()
+
+
+def test_search_web_pages_requests_plain_text_snippets(mock_db_cursor):
+    """Test that ts_headline is asked for plain-text snippets without <b> markup."""
+    cursor = mock_db_cursor('src.db.get_conn')
+    cursor.fetchall.return_value = []
+
+    search_web_pages([0.1] * 1024, 0.05, 5, snippet_query="example")
+
+    cursor.execute.assert_called_once()
+    sql, params = cursor.execute.call_args.args
+    assert "SET LOCAL hnsw.ef_search" in sql
+    assert "ts_headline" in sql and "SELECT url, content," not in sql
+    assert params[1] == "example"
+    assert 'StartSel="",StopSel=""' in params[2]
@@ -0,0 +1,41 @@
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from src.config import settings
+from src.embeddings import (
+    create_embedding_with_ollama,
+    normalize,
+    normalize_and_fit,
+    truncate_or_pad_vector,
+)
+
+
+def test_normalize_and_fit_pads_short_vectors():
+    """Test that short vectors are normalized and zero-padded."""
+    result = normalize_and_fit([3.0, 4.0], dims=4)
+
+    assert result == pytest.approx([0.6, 0.8, 0.0, 0.0])
+
+
+def test_normalize_and_fit_matches_normalize_then_truncate():
+    """Test that long vectors are normalized over all dims before truncating."""
+    vector = np.random.default_rng(0).normal(size=3072).tolist()
+
+    expected = truncate_or_pad_vector(normalize(vector), dims=1024)
+
+    assert normalize_and_fit(vector, dims=1024) == pytest.approx(expected, abs=1e-6)
+
+
+def test_normalize_and_fit_leaves_zero_vector():
+    """Test that an all-zero vector is returned unscaled."""
+    assert normalize_and_fit([0.0, 0.0], dims=3) == [0.0, 0.0, 0.0]
+
+
+@patch('src.embeddings.ollama_client')
+def test_create_embedding_with_ollama_uses_embedding_timeout(mock_client):
+    """Test that single embeddings override the shared client's default timeout."""
+    mock_client.post.return_value.json.return_value = {"embedding": [0.1, 0.2]}
+
+    assert create_embedding_with_ollama("some text") == [0.1, 0.2]
+    assert mock_client.post.call_args.kwargs["timeout"] == settings.ollama_embed_timeout_seconds
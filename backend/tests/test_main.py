@@ -7,7 +7,9 @@ import uuid
 import os
 os.environ['TESTING'] = 'True'
 
-from src.main import app
+# Keep importing the app from wiring up OpenTelemetry exporters
+with patch('src.instrumentation.instrument_application'):
+    from src.main import app
 
 @pytest.fixture(scope="module")
 def client():
@@ -29,7 +31,8 @@ def mock_db_functions():
          patch('src.main.delete_job') as mock_delete_job, \
          patch('src.main.get_web_pages') as mock_get_web_pages, \
          patch('src.main.get_dashboard_analytics') as mock_get_dashboard_analytics, \
-         patch('src.main.search') as mock_search:
+         patch('src.main.search') as mock_search, \
+         patch('src.main.cached_json', side_effect=lambda key, ttl, compute: compute()):
         
         yield {
             "get_jobs": mock_get_jobs,
@@ -118,6 +121,21 @@ def test_start_crawler_success(client, mock_db_functions, mock_celery_task):
     mock_celery_task.assert_called_once_with(str(job_id), "example.com", 2, {"some_flag": True})
     mock_db_functions['update_job'].assert_called_once()
 
+def test_start_crawler_dispatch_failure_marks_job_failed(client, mock_db_functions, mock_celery_task):
+    """
+    Test that a failed Celery dispatch is recorded on the job after the 202.
+    """
+    job_id = uuid.uuid4()
+    mock_db_functions['create_job'].return_value = {"id": job_id}
+    mock_celery_task.side_effect = ConnectionError("broker down")
+
+    response = client.post("/start-crawler", json={"domain": "example.com", "depth": 1})
+
+    assert response.status_code == 202
+    job_update = mock_db_functions['update_job'].call_args.args[1]
+    assert job_update.status == "failed"
+    assert job_update.result == {"error": "broker down"}
+
 
 
 def test_dashboard_analytics_endpoint(client, mock_db_functions):
@@ -145,3 +163,46 @@ def test_search_api_endpoint(client, mock_db_functions):
     assert response.status_code == 200
     assert response.json() == mock_results
     mock_db_functions['search'].assert_called_once_with("test", 5)
+
+def test_generic_exception_handler_rate_limits_tracebacks():
+    """
+    Test that a repeated exception only logs its traceback once per window.
+    """
+    import asyncio
+    from src.main import _exception_last_logged, generic_exception_handler
+
+    _exception_last_logged.clear()
+    exc = RuntimeError("boom")
+
+    with patch('src.main.logger') as mock_logger:
+        first = asyncio.run(generic_exception_handler(MagicMock(), exc))
+        second = asyncio.run(generic_exception_handler(MagicMock(), exc))
+
+    assert first.status_code == 500
+    assert second.status_code == 500
+    assert mock_logger.error.call_count == 2
+    assert mock_logger.error.call_args_list[0].kwargs == {"exc_info": True}
+    assert mock_logger.error.call_args_list[1].kwargs == {}
+
+def test_list_web_pages_rejects_unknown_sort(client):
+    """
+    Test that a sort column or order outside the allowlist returns 400 without touching the DB.
+    """
+    with patch('src.search.get_conn') as mock_get_conn:
+        bad_column = client.get("/web-pages?sort_by=content;DROP TABLE web_pages")
+        bad_order = client.get("/web-pages?sort_by=title&sort_order=sideways")
+
+    assert bad_column.status_code == 400
+    assert bad_order.status_code == 400
+    mock_get_conn.assert_not_called()
+
+def test_list_web_pages_allowed_sort_reaches_get_web_pages(client, mock_db_functions):
+    """
+    Test that an allowed sort is passed through to get_web_pages.
+    """
+    mock_db_functions['get_web_pages'].return_value = {"total": 0, "data": []}
+
+    response = client.get("/web-pages?limit=5&offset=10&sort_by=title&sort_order=asc&query=docs")
+
+    assert response.status_code == 200
+    mock_db_functions['get_web_pages'].assert_called_once_with(5, 10, "title", "asc", "docs")
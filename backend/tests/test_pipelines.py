@@ -5,18 +5,36 @@ from src.crawlers.scrapy.pipelines import CeleryPipeline
 
 class TestCeleryPipeline(unittest.TestCase):
 
-    @patch('src.crawlers.scrapy.pipelines.process_page_data_task.delay')
-    def test_process_item_sends_to_celery(self, mock_delay):
+    @patch('src.crawlers.scrapy.pipelines.process_pages_batch_task.delay')
+    def test_process_item_sends_full_batch_to_celery(self, mock_delay):
         # Arrange
-        pipeline = CeleryPipeline()
+        pipeline = CeleryPipeline(batch_size=2)
+        first = {"url": "http://example.com/1", "content": "some content"}
+        second = {"url": "http://example.com/2", "content": "more content"}
+        spider = MagicMock()
+
+        # Act
+        pipeline.process_item(first, spider)
+        mock_delay.assert_not_called()
+        result = pipeline.process_item(second, spider)
+
+        # Assert
+        mock_delay.assert_called_once_with([dict(first), dict(second)])
+        self.assertEqual(result, second)
+
+    @patch('src.crawlers.scrapy.pipelines.process_pages_batch_task.delay')
+    def test_close_spider_flushes_partial_batch(self, mock_delay):
+        # Arrange
+        pipeline = CeleryPipeline(batch_size=32)
         item = {"url": "http://example.com", "content": "some content"}
         spider = MagicMock()
 
         # Act
         result = pipeline.process_item(item, spider)
+        pipeline.close_spider(spider)
 
         # Assert
-        mock_delay.assert_called_once_with(dict(item))
+        mock_delay.assert_called_once_with([dict(item)])
         self.assertEqual(result, item)
 
 if __name__ == '__main__':
@@ -0,0 +1,161 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from src.search import (
+    WEB_PAGE_COUNT_QUERIES,
+    _embed_query,
+    get_query_embedding,
+    get_web_pages,
+    rag_chat_stream,
+    search,
+)
+
+
+@patch('src.search.set_cached')
+@patch('src.search.get_cached', return_value=None)
+@patch('src.search.create_embedding_with_ollama')
+def test_get_query_embedding_caches_normalized_query(mock_create_embedding, mock_get_cached, mock_set_cached):
+    """Test that equivalent queries reuse one Ollama embedding call."""
+    _embed_query.cache_clear()
+    mock_create_embedding.return_value = [3.0, 4.0]
+
+    first = get_query_embedding("Example Query ")
+    second = get_query_embedding("example query")
+
+    mock_create_embedding.assert_called_once_with("example query")
+    assert first == second
+    assert len(first) == 1024
+    assert first[:2] == pytest.approx([0.6, 0.8])
+    mock_set_cached.assert_called_once()
+
+
+@patch('src.search.get_cached')
+@patch('src.search.create_embedding_with_ollama')
+def test_get_query_embedding_uses_shared_cache(mock_create_embedding, mock_get_cached):
+    """Test that an embedding cached in Redis skips the Ollama call."""
+    _embed_query.cache_clear()
+    mock_get_cached.return_value = [0.5] * 1024
+
+    assert get_query_embedding("cached query") == [0.5] * 1024
+    mock_create_embedding.assert_not_called()
+
+
+@patch('src.search.search_web_pages')
+@patch('src.search.get_query_embedding', return_value=[0.1] * 1024)
+def test_search_uses_database_snippets(mock_get_query_embedding, mock_search_web_pages):
+    """Test that search asks the database for snippets instead of full content."""
+    mock_search_web_pages.return_value = [
+        {"url": "http://example.com", "title": "Example", "snippet": "an example page", "distance": -0.9}
+    ]
+
+    results = search("example", 5)
+
+    assert mock_search_web_pages.call_args.kwargs["snippet_query"] == "example"
+    assert results[0]["snippet"] == "an example page"
+    assert results[0]["structured_data"] is None
+
+
+@patch('src.search.search_web_pages')
+@patch('src.search.get_query_embedding', return_value=[0.1] * 1024)
+def test_search_returns_none_snippet_for_null_content(mock_get_query_embedding, mock_search_web_pages):
+    """Test that a page with NULL content yields a None snippet rather than failing."""
+    mock_search_web_pages.return_value = [
+        {"url": "http://example.com/image.jpg", "title": None, "snippet": None, "distance": -0.9}
+    ]
+
+    results = search("example", 5)
+
+    assert results[0]["snippet"] is None
+
+
+def test_get_web_pages_counts_when_offset_past_end(mock_db_cursor):
+    """Test that the total is still reported when the requested page is empty."""
+    cursor = mock_db_cursor('src.search.get_conn')
+    cursor.fetchall.return_value = []
+    cursor.fetchone.return_value = (3,)
+
+    result = get_web_pages(limit=10, offset=20, query="docs")
+
+    assert result == {"total": 3, "data": []}
+    cursor.execute.assert_called_with(WEB_PAGE_COUNT_QUERIES[True], ["docs"])
+
+
+class FakeStreamResponse:
+    def __init__(self, lines):
+        self.lines = lines
+
+    def raise_for_status(self):
+        pass
+
+    async def aiter_lines(self):
+        for line in self.lines:
+            yield line
+
+
+class FakeStreamContext:
+    def __init__(self, response):
+        self.response = response
+
+    async def __aenter__(self):
+        return self.response
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class FakeAsyncClient:
+    def __init__(self, lines):
+        self.lines = lines
+        self.stream_kwargs = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def stream(self, method, url, **kwargs):
+        self.stream_kwargs = kwargs
+        return FakeStreamContext(FakeStreamResponse(self.lines))
+
+
+@patch('src.search.settings.rag_max_doc_chars', 5)
+@patch('src.search.search_web_pages')
+@patch('src.search.get_query_embedding', return_value=[0.1] * 1024)
+def test_rag_chat_stream_builds_prompt_and_streams_bytes(mock_get_query_embedding, mock_search_web_pages):
+    """Test that the RAG prompt keeps its layout and chunks stream back as bytes."""
+    mock_search_web_pages.return_value = [
+        {"url": "http://example.com/a", "content": "abcdefghij"},
+        {"url": "http://example.com/b", "content": None},
+    ]
+    client = FakeAsyncClient([
+        '{"message": {"content": "Hello"}}',
+        "",
+        "   ",
+        "not json",
+        '{"message": {}}',
+        '{"message": {"content": " world"}}',
+    ])
+
+    async def collect():
+        return [chunk async for chunk in rag_chat_stream("what is a?")]
+
+    with patch('src.search.httpx.AsyncClient', return_value=client):
+        chunks = asyncio.run(collect())
+
+    assert chunks == [b"Hello", b" world"]
+
+    context_str = "URL: http://example.com/a\nContent: abcde\n\nURL: http://example.com/b\nContent: "
+    expected_prompt = f"""
+    You are an expert assistant. Answer the user's question based ONLY on the following context.
+    If the context does not contain the answer, say "I could not find an answer in the provided documents."
+
+    Context:
+    {context_str}
+
+    """
+    messages = client.stream_kwargs["json"]["messages"]
+    assert messages[0] == {"role": "system", "content": expected_prompt}
+    assert messages[1] == {"role": "user", "content": "what is a?"}
@@ -1,18 +1,16 @@
 
 import pytest
 from unittest.mock import patch, MagicMock
-from src.tasks import process_page_data_task
+from src.tasks import process_page_data_task, process_pages_batch_task
 
 @patch('src.tasks.insert_web_page')
-@patch('src.tasks.truncate_or_pad_vector')
-@patch('src.tasks.normalize')
+@patch('src.tasks.normalize_and_fit')
 @patch('src.tasks.create_embedding_with_ollama')
-def test_process_page_data_task_html(mock_create_embedding, mock_normalize, mock_truncate, mock_insert):
+def test_process_page_data_task_html(mock_create_embedding, mock_normalize_and_fit, mock_insert):
     """Test processing of HTML page data."""
     mock_embedding = [0.1] * 1024
     mock_create_embedding.return_value = mock_embedding
-    mock_normalize.return_value = mock_embedding
-    mock_truncate.return_value = mock_embedding
+    mock_normalize_and_fit.return_value = mock_embedding
 
     page_data = {
         "url": "http://example.com",
@@ -23,21 +21,18 @@ def test_process_page_data_task_html(mock_create_embedding, mock_normalize, mock
     process_page_data_task(page_data)
 
     mock_create_embedding.assert_called_once_with("This is some html content.")
-    mock_normalize.assert_called_once_with(mock_embedding)
-    mock_truncate.assert_called_once_with(mock_embedding, dims=1024)
+    mock_normalize_and_fit.assert_called_once_with(mock_embedding, dims=1024)
     mock_insert.assert_called_once()
 
 
 @patch('src.tasks.insert_web_page')
-@patch('src.tasks.truncate_or_pad_vector')
-@patch('src.tasks.normalize')
+@patch('src.tasks.normalize_and_fit')
 @patch('src.tasks.create_multimodal_embedding_with_ollama')
-def test_process_page_data_task_image(mock_create_embedding, mock_normalize, mock_truncate, mock_insert):
+def test_process_page_data_task_image(mock_create_embedding, mock_normalize_and_fit, mock_insert):
     """Test processing of image page data."""
     mock_embedding = [0.2] * 1024
     mock_create_embedding.return_value = mock_embedding
-    mock_normalize.return_value = mock_embedding
-    mock_truncate.return_value = mock_embedding
+    mock_normalize_and_fit.return_value = mock_embedding
 
     page_data = {
         "url": "http://example.com/image.jpg",
@@ -48,6 +43,64 @@ def test_process_page_data_task_image(mock_create_embedding, mock_normalize, moc
     process_page_data_task(page_data)
 
     mock_create_embedding.assert_called_once_with("http://example.com/image.jpg")
-    mock_normalize.assert_called_once_with(mock_embedding)
-    mock_truncate.assert_called_once_with(mock_embedding, dims=1024)
+    mock_normalize_and_fit.assert_called_once_with(mock_embedding, dims=1024)
     mock_insert.assert_called_once()
+
+
+@patch('src.tasks.insert_web_pages')
+@patch('src.tasks.normalize_and_fit', side_effect=lambda v, dims: v)
+@patch('src.tasks.create_embeddings_batch_with_ollama')
+def test_process_pages_batch_task_embeds_text_in_one_request(mock_create_batch, mock_normalize_and_fit, mock_insert):
+    """Test that text pages in a batch share a single embedding request."""
+    mock_create_batch.return_value = [[0.1] * 1024, [0.2] * 1024]
+
+    page_datas = [
+        {"url": "http://example.com/1", "content": "first page", "embedding_type": "text"},
+        {"url": "http://example.com/2", "content": "second page", "embedding_type": "text"},
+        {"url": None, "content": "missing url"},
+    ]
+    process_pages_batch_task(page_datas)
+
+    mock_create_batch.assert_called_once_with(["first page", "second page"])
+    mock_insert.assert_called_once()
+    inserted = mock_insert.call_args.args[0]
+    assert len(inserted) == 2
+    assert inserted[0]["url"] == "http://example.com/1"
+    assert inserted[0]["embedding"] == [0.1] * 1024
+    assert inserted[1]["embedding"] == [0.2] * 1024
+
+
+@patch('src.tasks.process_page_data_task.delay')
+@patch('src.tasks.insert_web_pages')
+@patch('src.tasks.normalize_and_fit', side_effect=lambda v, dims: v)
+@patch('src.tasks.create_multimodal_embedding_with_ollama', side_effect=RuntimeError("image fetch failed"))
+@patch('src.tasks.create_embeddings_batch_with_ollama')
+def test_process_pages_batch_task_redispatches_failed_pages(mock_create_batch, mock_create_multimodal, mock_normalize_and_fit, mock_insert, mock_delay):
+    """Test that a failing page is retried on its own while the rest of the batch is inserted."""
+    mock_create_batch.return_value = [[0.1] * 1024]
+
+    page_datas = [
+        {"url": "http://example.com/1", "content": "first page", "embedding_type": "text"},
+        {"url": "http://example.com/image.jpg", "file_type": "image", "embedding_type": "vision"},
+    ]
+    process_pages_batch_task(page_datas)
+
+    inserted = mock_insert.call_args.args[0]
+    assert [page["url"] for page in inserted] == ["http://example.com/1"]
+    mock_delay.assert_called_once_with(page_datas[1])
+
+
+@patch('src.tasks.insert_web_pages')
+@patch('src.tasks.create_embeddings_batch_with_ollama')
+def test_process_pages_batch_task_rejects_short_embedding_response(mock_create_batch, mock_insert):
+    """Test that a batch response missing embeddings fails instead of dropping pages."""
+    mock_create_batch.return_value = [[0.1] * 1024]
+
+    page_datas = [
+        {"url": "http://example.com/1", "content": "first page", "embedding_type": "text"},
+        {"url": "http://example.com/2", "content": "second page", "embedding_type": "text"},
+    ]
+    with pytest.raises(ValueError):
+        process_pages_batch_task(page_datas)
+
+    mock_insert.assert_not_called()